@@ -0,0 +1,24 @@
+import inspect
+from typing import Any, Callable, Dict, Tuple
+
+
+def bind_arguments(
+    handler: Callable[..., None],
+    variables: Dict[str, Any],
+) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    '''制御ハンドラに渡す引数を位置引数とキーワード引数に割り当てる。
+
+    Args:
+        handler: 制御ハンドラ
+        variables: 制御ハンドラに渡す引数（引数名と制御オブジェクトの辞書）
+
+    Returns:
+        位置引数のタプルとキーワード引数の辞書
+    '''
+    try:
+        arguments = inspect.signature(handler).bind(**variables)
+    except ValueError:
+        # シグネチャを取得できない場合はすべての引数をキーワード引数として渡す
+        return (), variables
+
+    return arguments.args, arguments.kwargs
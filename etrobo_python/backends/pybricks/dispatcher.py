@@ -67,7 +67,7 @@ class Dispatcher(object):
                     handler(**variables)
 
                 if writer is not None:
-                    writer.write([device for _, device in self.devices])
+                    writer.write()
         except StopIteration:
             print('Stopped by handler.')
 
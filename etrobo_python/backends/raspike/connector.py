@@ -198,23 +198,24 @@ class _Connector(object):
             self.running = False
 
     def _run_handler(self) -> None:
-        previous_time = 0
+        # 実行時刻はシステム時刻の変更に影響されない単調増加の時刻（単位はns）で管理する
+        interval_time = int(self.interval * 1_000_000_000)
+        next_time = time.monotonic_ns()
 
         try:
             while self.running:
                 # 時刻を確認する
-                interval_time = int(self.interval * 1000)
-                current_time = int(time.time() * 1000)
-                process_time = (current_time // interval_time) * interval_time
-
-                # 前回の時刻との間隔が設定値より短いなら待機する
-                if process_time == previous_time:
-                    next_time = previous_time + interval_time
-                    time.sleep((next_time - current_time) * 0.001)
+                current_time = time.monotonic_ns()
+
+                # 次の実行時刻になっていないなら待機する
+                if current_time < next_time:
+                    time.sleep((next_time - current_time) * 1e-9)
                     continue
 
+                # 次の実行時刻を決める（処理が遅れて過ぎてしまった実行時刻は飛ばす）
+                next_time += ((current_time - next_time) // interval_time + 1) * interval_time
+
                 # 制御処理を実行
-                previous_time = process_time
                 self.handler()
 
                 # 接続を維持するためにダミーコマンドを送信
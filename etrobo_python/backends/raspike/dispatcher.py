@@ -1,5 +1,6 @@
 from typing import Any, Callable, List, Optional, Tuple
 
+from etrobo_python.backends.arguments import bind_arguments
 from etrobo_python.device import Device
 from etrobo_python.log import LogWriter
 
@@ -49,16 +50,19 @@ class Dispatcher(object):
     def dispatch(self) -> None:
         variables = {name: device for name, device in self.devices}
 
+        # 制御ハンドラに渡す引数は実行前に割り当てておく
+        calls = [(handler, *bind_arguments(handler, variables)) for handler in self.handlers]
+
         writer: Optional[LogWriter] = None
         if self.logfile is not None:
             writer = LogWriter(self.logfile, self.devices)
 
         def run_handlers() -> None:
-            for handler in self.handlers:
-                handler(**variables)
+            for handler, args, kwargs in calls:
+                handler(*args, **kwargs)
 
             if writer is not None:
-                writer.write([device for _, device in self.devices])
+                writer.write()
 
         connect_spike(
             handler=run_handlers,
@@ -1,5 +1,7 @@
+import functools
+import struct
 import time
-from typing import Any, List, Tuple
+from typing import Any, List, Tuple, Union
 import warnings
 
 import etrobo_python
@@ -7,6 +9,12 @@ import etrobo_python
 import libraspike_art_python as lib
 from libraspike_art_python import pbio_port, pbio_color, hub_button, sound, pup_direction, pbio_error
 
+# ログデータを書き込むための関数
+_PACK_U32 = struct.Struct('>I').pack_into
+_PACK_U16 = struct.Struct('>H').pack_into
+_PACK_HH = struct.Struct('>hh').pack_into
+
+
 def create_device(device_type: str, port: str) -> Any:
     if device_type == 'hub':
         return Hub()
@@ -125,16 +133,25 @@ class Hub(etrobo_python.Hub):
         lib.hub_imu_reset_heading()
 
     def get_log(self) -> bytes:
-        self.log[:4] = int.to_bytes(int(self.get_time() * 1000), 4, 'big')
-        self.log[4] = (
-            int(self.is_left_button_pressed())
-            | int(self.is_right_button_pressed()) << 1
-            | int(self.is_up_button_pressed()) << 2
-            | int(self.is_down_button_pressed()) << 3
-        )
-
+        self.get_log_into(self.log)
         return self.log
 
+    def get_log_into(self, out: Union[bytearray, memoryview]) -> None:
+        _PACK_U32(out, 0, int(self.get_time() * 1000))
+
+        # ボタンの状態はライブラリの関数を直接呼び出して取得する
+        is_pressed = lib.hub_button_is_pressed
+        left = is_pressed(hub_button.LEFT)
+        right = is_pressed(hub_button.RIGHT)
+        up = is_pressed(hub_button.BT)
+        down = is_pressed(hub_button.CENTER)
+        out[4] = (
+            int(left)
+            | int(right) << 1
+            | int(up) << 2
+            | int(down) << 3
+        )
+
 
 _MOTOR_DEVICES: List[Any] = []
 
@@ -172,6 +189,14 @@ class _Motor(etrobo_python.Motor):
 
             _MOTOR_DEVICES.append(self.device)
 
+            # 初期化後は初期化の確認を行わずにライブラリの関数を直接呼び出す
+            self.get_count = functools.partial(lib.pup_motor_get_count, self.device)  # type: ignore
+            self.reset_count = functools.partial(lib.pup_motor_reset_count, self.device)  # type: ignore
+
+            # 引数を受け取る関数はデバイスを束縛した関数を保存しておく
+            self._set_power = functools.partial(lib.pup_motor_set_power, self.device)
+            self._brake = functools.partial(lib.pup_motor_brake, self.device)
+
     def get_count(self) -> int:
         self.setup_device()
         return lib.pup_motor_get_count(self.device)
@@ -182,17 +207,20 @@ class _Motor(etrobo_python.Motor):
 
     def set_power(self, power: int) -> None:
         self.setup_device()
-        lib.pup_motor_set_power(self.device, power)
+        self._set_power(power)
 
     def set_brake(self, brake: bool) -> None:
         self.setup_device()
         if brake:
-            lib.pup_motor_brake(self.device)
+            self._brake()
 
     def get_log(self) -> bytes:
-        self.log[:] = int.to_bytes(self.get_count() & 0xffffffff, 4, 'big')
+        self.get_log_into(self.log)
         return self.log
 
+    def get_log_into(self, out: Union[bytearray, memoryview]) -> None:
+        _PACK_U32(out, 0, self.get_count() & 0xffffffff)
+
 
 class Motor(_Motor):
     def __init__(self, port: int) -> None:
@@ -215,36 +243,43 @@ class ColorSensor(etrobo_python.ColorSensor):
         if self.device is None:
             self.device = lib.pup_color_sensor_get_device(self.port)
 
+            # デバイスを束縛した関数を保存しておく
+            self._reflection = functools.partial(lib.pup_color_sensor_reflection, self.device)
+            self._ambient = functools.partial(lib.pup_color_sensor_ambient, self.device)
+            self._rgb = functools.partial(lib.pup_color_sensor_rgb, self.device)
+
     def get_brightness(self) -> int:
         self.setup_device()
         self.mode = 0
-        return lib.pup_color_sensor_reflection(self.device)
+        return self._reflection()
 
     def get_ambient(self) -> int:
         self.setup_device()
         self.mode = 1
-        return lib.pup_color_sensor_ambient(self.device)
+        return self._ambient()
 
     def get_raw_color(self) -> Tuple[int, int, int]:
         self.setup_device()
         self.mode = 2
-        return lib.pup_color_sensor_rgb(self.device)
+        return self._rgb()
 
     def get_log(self) -> bytes:
+        self.get_log_into(self.log)
+        return self.log
+
+    def get_log_into(self, out: Union[bytearray, memoryview]) -> None:
         if self.mode == 0:
-            self.log[0] = self.get_brightness()
-            self.log[1] = 0
-            self.log[2], self.log[3], self.log[4] = 0, 0, 0
+            out[0] = self.get_brightness()
+            out[1] = 0
+            out[2], out[3], out[4] = 0, 0, 0
         elif self.mode == 1:
-            self.log[0] = 0
-            self.log[1] = self.get_ambient()
-            self.log[2], self.log[3], self.log[4] = 0, 0, 0
+            out[0] = 0
+            out[1] = self.get_ambient()
+            out[2], out[3], out[4] = 0, 0, 0
         elif self.mode == 2:
-            self.log[0] = 0
-            self.log[1] = 0
-            self.log[2], self.log[3], self.log[4] = self.get_raw_color()
-
-        return self.log
+            out[0] = 0
+            out[1] = 0
+            out[2], out[3], out[4] = self.get_raw_color()
 
 
 class TouchSensor(etrobo_python.TouchSensor):
@@ -257,14 +292,20 @@ class TouchSensor(etrobo_python.TouchSensor):
         if self.device is None:
             self.device = lib.pup_force_sensor_get_device(self.port)
 
+            # 初期化後は初期化の確認を行わずにライブラリの関数を直接呼び出す
+            self.is_pressed = functools.partial(lib.pup_force_sensor_touched, self.device)  # type: ignore
+
     def is_pressed(self) -> bool:
         self.setup_device()
         return lib.pup_force_sensor_touched(self.device)
 
     def get_log(self) -> bytes:
-        self.log[0] = int(self.is_pressed())
+        self.get_log_into(self.log)
         return self.log
 
+    def get_log_into(self, out: Union[bytearray, memoryview]) -> None:
+        out[0] = int(self.is_pressed())
+
 
 class SonarSensor(etrobo_python.SonarSensor):
     def __init__(self, port: pbio_port) -> None:
@@ -276,6 +317,10 @@ class SonarSensor(etrobo_python.SonarSensor):
         if self.device is None:
             self.device = lib.pup_ultrasonic_sensor_get_device(self.port)
 
+            # 初期化後は初期化の確認を行わずにライブラリの関数を直接呼び出す
+            self.listen = functools.partial(lib.pup_ultrasonic_sensor_presence, self.device)  # type: ignore
+            self.get_distance = functools.partial(lib.pup_ultrasonic_sensor_distance, self.device)  # type: ignore
+
     def listen(self) -> bool:
         self.setup_device()
         return lib.pup_ultrasonic_sensor_presence(self.device)
@@ -285,9 +330,12 @@ class SonarSensor(etrobo_python.SonarSensor):
         return lib.pup_ultrasonic_sensor_distance(self.device)
 
     def get_log(self) -> bytes:
-        self.log[:] = int.to_bytes(self.get_distance(), 2, 'big')
+        self.get_log_into(self.log)
         return self.log
 
+    def get_log_into(self, out: Union[bytearray, memoryview]) -> None:
+        _PACK_U16(out, 0, self.get_distance())
+
 
 class GyroSensor(etrobo_python.GyroSensor):
     def __init__(self) -> None:
@@ -329,8 +377,10 @@ class GyroSensor(etrobo_python.GyroSensor):
         return self.get_angular_velocity()
 
     def get_log(self) -> bytes:
+        self.get_log_into(self.log)
+        return self.log
+
+    def get_log_into(self, out: Union[bytearray, memoryview]) -> None:
         if not self.initialized:
             self.__initialize()
-        self.log[:2] = int.to_bytes(self.get_angle(), 2, 'big', signed=True)
-        self.log[2:] = int.to_bytes(self.get_angular_velocity(), 2, 'big', signed=True)
-        return self.log
+        _PACK_HH(out, 0, self.get_angle(), self.get_angular_velocity())
@@ -1,6 +1,7 @@
-import base64
+import binascii
+import struct
 import warnings
-from typing import Callable, Optional, Tuple
+from typing import Callable, Tuple
 
 import serial
 
@@ -47,7 +48,16 @@ command: number - value
 # 同じデータを再送する回数
 RETRANSMIT = 5
 
-_CONNECTOR: Optional['_Connector'] = None
+# 受信データと送信データを読み書きするための関数
+# 3バイトの値は1バイト前から4バイトの値として読み込み、上位の1バイトを捨てる
+_UNPACK_U16 = struct.Struct('>H').unpack_from
+_UNPACK_U32 = struct.Struct('>I').unpack_from
+_PACK_U32 = struct.Struct('>I').pack_into
+
+# Base64の文字（0-9, A-Z, a-z, '+', '/', '='）以外のバイト値
+_B64_DELETE = bytes(
+    v for v in range(256)
+    if not (47 <= v <= 57 or 65 <= v <= 90 or 97 <= v <= 122 or v in (43, 61)))
 
 
 def connect_spike(
@@ -57,32 +67,33 @@ def connect_spike(
     baudrate: int,
     timeout: float,
 ) -> None:
-    global _CONNECTOR
-
-    if _CONNECTOR is not None:
+    if _Connector.current is not None:
         raise Exception('This process have already connected to the Spike.')
 
-    _CONNECTOR = _Connector(
+    _Connector.current = _Connector(
         handler=handler,
         interval=interval,
         port=port,
         baudrate=baudrate,
         timeout=timeout)
-    _CONNECTOR.run()
-    _CONNECTOR = None
+    _Connector.current.run()
+    _Connector.current = None
 
 
 def _get_connector() -> '_Connector':
-    global _CONNECTOR
-
-    if _CONNECTOR is None:
+    if _Connector.current is None:
         raise Exception(
             'This process have been not connected to the Spike yet.')
 
-    return _CONNECTOR
+    return _Connector.current
 
 
 class _Connector(object):
+    # 接続中の接続オブジェクト
+    # 観測データの読み込みは制御処理の実行中（接続中）にしか行われないため、
+    # 読み込み処理では_get_connector()による確認を行わずにこの属性を直接参照する
+    current: '_Connector' = None  # type: ignore
+
     def __init__(
         self,
         handler: Callable[[], None],
@@ -97,6 +108,9 @@ class _Connector(object):
 
         # 受信バッファ
         self.recv_buffer = bytearray(32)
+        # シリアル通信から読み込んだデータを一時的に保存するバッファ
+        self.recv_scratch = bytearray(32)
+        self.recv_scratch_view = memoryview(self.recv_scratch)
         # 受信データ
         self.recv_data = bytearray(27)
         # 送信データ
@@ -108,6 +122,10 @@ class _Connector(object):
         self.ping_required = True
 
     def run(self) -> None:
+        # 受信処理と制御処理は同じスレッドで実行する
+        # SPIKEは設定した間隔で観測データを送信するため、観測データの受信を契機に制御処理を実行する
+        # （スレッド間の同期やGILの競合が発生しないため、受信用のスレッドは作成しない）
+
         # シリアル通信のバッファを空にする
         self.serial.reset_input_buffer()
 
@@ -121,7 +139,7 @@ class _Connector(object):
                     continue
 
                 # 受信データの時刻を取得する
-                report_time = int.from_bytes(self.recv_data[2:5], 'big')
+                report_time = _UNPACK_U32(self.recv_data, 1)[0] & 0xffffff
 
                 # 最初に受信したデータの時刻が1000よりも大きい場合はリセットコマンドを再送信する
                 if not self.started:
@@ -152,47 +170,52 @@ class _Connector(object):
 
     def _recv_report(self) -> bool:
         # 受信データを読み込む
-        buf = self.serial.read(len(self.recv_buffer))
+        buf = self.recv_scratch
+        size = self.serial.readinto(buf)
 
         # タイムアウト
-        if len(buf) != len(self.recv_buffer):
+        if size != len(self.recv_buffer):
             raise Exception('Connection is timeout.')
 
         # パケットの先頭を探す
         # 最後に先頭のマジックナンバーが見つかった場合は読み込み処理を行い
         # Base64のデコードやパリティにデータの確認を任せる
-        offset = 0
-        while offset < len(buf) - 1 and (buf[offset] != 102 or buf[offset + 1] != 51):
-            offset = buf.find(102, offset + 1)
-            if offset < 0:
+        offset = buf.find(b'f3')  # 0x66, 0x33
+        if offset < 0:
+            if buf[-1] != 102:
                 return False
+            offset = len(buf) - 1
 
         # パケットの内容をコピーする
-        size = 0
-        for v in buf[offset:]:
-            if (47 <= v <= 57 or 65 <= v <= 90 or 97 <= v <= 122 or v in (43, 61)):
-                self.recv_buffer[size] = v
-                size += 1
+        chars = buf[offset:].translate(None, _B64_DELETE)
+        size = len(chars)
+        self.recv_buffer[:size] = chars
 
         # 残りのデータを受信する
         while size < len(self.recv_buffer):
-            buf = self.serial.read(len(self.recv_buffer) - size)
-            if len(buf) < len(self.recv_buffer) - size:
+            remain = len(self.recv_buffer) - size
+            if self.serial.readinto(self.recv_scratch_view[:remain]) < remain:
                 raise Exception('Connection is timeout')
 
             # パケットの内容をコピーする
-            for v in buf:
-                if (47 <= v <= 57 or 65 <= v <= 90 or 97 <= v <= 122 or v in (43, 61)):
-                    self.recv_buffer[size] = v
-                    size += 1
+            chars = buf[:remain].translate(None, _B64_DELETE)
+            self.recv_buffer[size:size + len(chars)] = chars
+            size += len(chars)
 
         # base64の文字列をデコードしてデータを取得する
+        # 受信バッファはBase64の文字のみを含むため、文字列に変換せずにデコードする
         try:
-            data = base64.b64decode(self.recv_buffer.decode('ascii'))
-        except UnicodeDecodeError:
+            data = binascii.a2b_base64(self.recv_buffer)
+        except binascii.Error:
+            return False
+
+        # パディングを含むパケットは長さが足りないため破棄する
+        # （recv_dataの長さが変わると各データの位置がずれてしまう）
+        if len(data) != 24:
             return False
 
         # チェックサムを確認する
+        # チェックサムは各バイトの論理和ではなく総和（SPIKE側のraspyke_main.pyと同じ計算）
         if data[1] & 0xf != sum(data[2:]) & 0x0f:
             return False
 
@@ -210,8 +233,9 @@ class _Connector(object):
 
         self.send_data[0] = 0x7f
         self.send_data[2] = command
-        self.send_data[3:7] = int.to_bytes(value & 0xffffffff, 4, 'big')
+        _PACK_U32(self.send_data, 3, value & 0xffffffff)
 
+        # チェックサムはSPIKE側のraspyke_main.pyと同じく各バイトの総和とする
         self.send_data[1] = sum(self.send_data[2:]) & 0xff
         self.serial.write(self.send_data)
 
@@ -225,13 +249,13 @@ class Hub(object):
         _get_connector().send_command(command=0x03, value=code)
 
     def get_time(self) -> int:
-        return int.from_bytes(_get_connector().recv_data[2:5], 'big')
+        return _UNPACK_U32(_Connector.current.recv_data, 1)[0] & 0xffffff
 
     def get_battery_voltage(self) -> int:
-        return int.from_bytes(_get_connector().recv_data[23:25], 'big')
+        return _UNPACK_U16(_Connector.current.recv_data, 23)[0]
 
     def get_battery_current(self) -> int:
-        return int.from_bytes(_get_connector().recv_data[25:27], 'big')
+        return _UNPACK_U16(_Connector.current.recv_data, 25)[0]
 
     def play_speaker_tone(self, frequency: int, duration: int) -> None:
         value = (frequency & 0xffff) << 16 | duration & 0xffff
@@ -241,25 +265,31 @@ class Hub(object):
         _get_connector().send_command(command=0x02, value=volume)
 
     def get_button_pressed(self) -> int:
-        return int.from_bytes(_get_connector().recv_data[21:23], 'big')
+        return _UNPACK_U16(_Connector.current.recv_data, 21)[0]
 
 
 class Motor(object):
     def __init__(self, port: int) -> None:
         self.port = port
+        self.count_offset = 4 + port * 3
+        self.power_command = (port + 1) * 16 + 1
+        self.brake_command = (port + 1) * 16 + 2
+        self.reset_command = (port + 1) * 16 + 3
         self.power_value = 0
         self.power_retransmit = RETRANSMIT
         self.brake_value = 0
         self.brake_retransmit = RETRANSMIT
 
     def get_count(self) -> int:
-        index = 5 + self.port * 3
-        return int.from_bytes(
-            _get_connector().recv_data[index:index + 3], 'big', signed=True)
+        value = _UNPACK_U32(_Connector.current.recv_data, self.count_offset)[0] & 0xffffff
+
+        if value < 0x800000:
+            return value
+        else:
+            return value - 0x1000000
 
     def reset_count(self) -> None:
-        command = (self.port + 1) * 16 + 3
-        _get_connector().send_command(command=command, value=0)
+        _get_connector().send_command(command=self.reset_command, value=0)
 
     def set_pwm(self, power: int) -> None:
         power = min(max(power, -128), 127)
@@ -270,8 +300,7 @@ class Motor(object):
 
         if self.power_retransmit > 0:
             self.power_retransmit -= 1
-            command = (self.port + 1) * 16 + 1
-            _get_connector().send_command(command=command, value=self.power_value)
+            _get_connector().send_command(command=self.power_command, value=self.power_value)
 
     def set_brake(self, brake: bool) -> None:
         if brake != self.brake_value:
@@ -280,29 +309,28 @@ class Motor(object):
 
         if self.brake_retransmit > 0:
             self.brake_retransmit -= 1
-            command = (self.port + 1) * 16 + 2
-            _get_connector().send_command(command=command, value=int(brake))
+            _get_connector().send_command(command=self.brake_command, value=int(brake))
 
 
 class ColorSensor(object):
     def get_brightness(self) -> int:
-        conn = _get_connector()
+        conn = _Connector.current
 
         if conn.recv_data[15] != 0 or conn.recv_data[16] != 2:
             conn.send_command(command=0x41, value=2)
 
-        return _get_connector().recv_data[14]
+        return conn.recv_data[14]
 
     def get_ambient(self) -> int:
-        conn = _get_connector()
+        conn = _Connector.current
 
         if conn.recv_data[15] != 0 or conn.recv_data[16] != 0:
             conn.send_command(command=0x41, value=0)
 
-        return _get_connector().recv_data[14]
+        return conn.recv_data[14]
 
     def get_raw_color(self) -> Tuple[int, int, int]:
-        conn = _get_connector()
+        conn = _Connector.current
 
         if conn.recv_data[15] == 0 or conn.recv_data[16] == 0:
             conn.send_command(command=0x41, value=3)
@@ -322,7 +350,7 @@ class SonarSensor(object):
         return False
 
     def get_distance(self) -> int:
-        return _get_connector().recv_data[17]
+        return _Connector.current.recv_data[17]
 
 
 class GyroSensor(object):
@@ -330,7 +358,7 @@ class GyroSensor(object):
         _get_connector().send_command(command=0x51, value=0)
 
     def get_angle(self) -> int:
-        value = int.from_bytes(_get_connector().recv_data[18:21], 'big')
+        value = _UNPACK_U32(_Connector.current.recv_data, 17)[0] & 0xffffff
         value = value >> 12
 
         if value < 0x800:
@@ -339,7 +367,7 @@ class GyroSensor(object):
             return value - 0x1000
 
     def get_angular_velocity(self) -> int:
-        value = int.from_bytes(_get_connector().recv_data[18:21], 'big')
+        value = _UNPACK_U32(_Connector.current.recv_data, 17)[0] & 0xffffff
         value = value & 0x0fff
 
         if value < 0x800:
@@ -352,3 +380,17 @@ class GyroSensor(object):
             'get_angler_velocity is deprecated, use get_angular_velocity instead.',
             DeprecationWarning)
         return self.get_angular_velocity()
+
+    def get_angle_and_velocity(self) -> Tuple[int, int]:
+        # 角度と角速度は同じ3バイトに格納されているため、まとめて読み込む
+        value = _UNPACK_U32(_Connector.current.recv_data, 17)[0] & 0xffffff
+        angle = value >> 12
+        velocity = value & 0x0fff
+
+        if angle >= 0x800:
+            angle -= 0x1000
+
+        if velocity >= 0x800:
+            velocity -= 0x1000
+
+        return angle, velocity
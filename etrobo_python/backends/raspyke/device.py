@@ -215,6 +215,7 @@ class GyroSensor(etrobo_python.GyroSensor):
         return self.get_angular_velocity()
 
     def get_log(self) -> bytes:
-        self.log[:2] = int.to_bytes(self.get_angle(), 2, 'big', signed=True)
-        self.log[2:] = int.to_bytes(self.get_angler_velocity(), 2, 'big', signed=True)
+        angle, velocity = self.gyro_sensor.get_angle_and_velocity()
+        self.log[:2] = int.to_bytes(angle, 2, 'big', signed=True)
+        self.log[2:] = int.to_bytes(velocity, 2, 'big', signed=True)
         return self.log
@@ -12,6 +12,7 @@ def connect_simulator(
     address: str,
     course: str,
     timeout: float,
+    single_thread: bool = False,
 ) -> None:
     global _CONNECTOR
 
@@ -24,7 +25,8 @@ def connect_simulator(
         interval=interval,
         address=address,
         course=course,
-        timeout=timeout)
+        timeout=timeout,
+        single_thread=single_thread)
     _CONNECTOR.run()
     _CONNECTOR = None
 
@@ -47,6 +49,7 @@ class _Connector(object):
         address: str,
         course: str,
         timeout: float,
+        single_thread: bool = False,
     ) -> None:
         if course.lower() == 'right':
             self.send_address = (address, 54003)
@@ -58,6 +61,8 @@ class _Connector(object):
         self.handler = handler
         self.interval = round(interval * 1_000_000)
         self.timeout = timeout
+        # Trueの場合は受信スレッドで制御処理を実行する（制御処理のスレッドを作成しない）
+        self.single_thread = single_thread
 
         self.recv_buffer = bytearray(1024)
         self.recv_data = bytearray(1024)
@@ -85,6 +90,16 @@ class _Connector(object):
         self.reserved_data.append((fmt, offset, args))
 
     def run(self) -> None:
+        if self.single_thread:
+            self.running = True
+
+            try:
+                self._run_receiver()
+            except KeyboardInterrupt:
+                print('Interrupted by keyboard.')
+
+            return
+
         receiver_thread = threading.Thread(
             target=self._run_receiver,
             name='Simulator_run_receiver',
@@ -132,10 +147,16 @@ class _Connector(object):
                     self.recv_time = unpack_from('<Q', buffer, 16)[0]
                     self.recv_buffer[:] = buffer
 
-                # 計算スレッドに通知
-                self.event.set()
+                if self.single_thread:
+                    # 受信したスレッドで制御処理を実行する
+                    self._process_report()
+                else:
+                    # 計算スレッドに通知
+                    self.event.set()
         except socket.timeout:
             print('Connection is timeout.')
+        except StopIteration:
+            print('Stopped by handler.')
         finally:
             print('Closing the connection.')
             self.running = False
@@ -146,31 +167,33 @@ class _Connector(object):
         try:
             while self.event.wait(self.timeout) and self.running:
                 self.event.clear()
+                self._process_report()
+        except StopIteration:
+            print('Stopped by handler.')
+        finally:
+            self.running = False
 
-                # 時刻を確認する
-                with self.lock:
-                    proc_time = (self.recv_time // self.interval) * self.interval
+    def _process_report(self) -> None:
+        # 時刻を確認する
+        with self.lock:
+            proc_time = (self.recv_time // self.interval) * self.interval
 
-                    if self.proc_time == proc_time:
-                        continue
+            if self.proc_time == proc_time:
+                return
 
-                    self.proc_time = proc_time
-                    self.recv_data[:] = self.recv_buffer
+            self.proc_time = proc_time
+            self.recv_data[:] = self.recv_buffer
 
-                # 状態を更新する
-                for fmt, offset, args in self.reserved_data:
-                    pack_into(fmt, self.send_data, offset, *args)
+        # 状態を更新する
+        for fmt, offset, args in self.reserved_data:
+            pack_into(fmt, self.send_data, offset, *args)
 
-                self.reserved_data.clear()
-                self.handler()
+        self.reserved_data.clear()
+        self.handler()
 
-                # データをUnityに送信する
-                pack_into('<QQ', self.send_data, 8, self.recv_time, self.recv_time)
-                self.sock.sendto(self.send_data, self.send_address)
-        except StopIteration:
-            print('Stopped by handler.')
-        finally:
-            self.running = False
+        # データをUnityに送信する
+        pack_into('<QQ', self.send_data, 8, self.recv_time, self.recv_time)
+        self.sock.sendto(self.send_data, self.send_address)
 
 
 class Hub(object):
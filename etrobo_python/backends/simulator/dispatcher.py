@@ -2,6 +2,7 @@ import os
 from subprocess import DEVNULL, PIPE, Popen
 from typing import Any, Callable, List, Optional, Tuple
 
+from etrobo_python.backends.arguments import bind_arguments
 from etrobo_python.device import Device
 from etrobo_python.log import LogWriter
 
@@ -15,6 +16,7 @@ def create_dispatcher(
     course: str = 'left',
     timeout: float = 5.0,
     logfile: Optional[str] = None,
+    single_thread: bool = False,
     **kwargs: Any,
 ) -> Any:
     return Dispatcher(
@@ -24,6 +26,7 @@ def create_dispatcher(
         course=course,
         timeout=timeout,
         logfile=logfile,
+        single_thread=single_thread,
     )
 
 
@@ -36,6 +39,7 @@ class Dispatcher(object):
         course: str,
         timeout: float,
         logfile: Optional[str],
+        single_thread: bool,
     ) -> None:
         self.devices = devices
         self.handlers = handlers
@@ -43,20 +47,24 @@ class Dispatcher(object):
         self.course = course
         self.timeout = timeout
         self.logfile = logfile
+        self.single_thread = single_thread
 
     def dispatch(self) -> None:
         variables = {name: device for name, device in self.devices}
 
+        # 制御ハンドラに渡す引数は実行前に割り当てておく
+        calls = [(handler, *bind_arguments(handler, variables)) for handler in self.handlers]
+
         writer: Optional[LogWriter] = None
         if self.logfile is not None:
             writer = LogWriter(self.logfile, self.devices)
 
         def run_handlers() -> None:
-            for handler in self.handlers:
-                handler(**variables)
+            for handler, args, kwargs in calls:
+                handler(*args, **kwargs)
 
             if writer is not None:
-                writer.write([device for _, device in self.devices])
+                writer.write()
 
         connect_simulator(
             handler=run_handlers,
@@ -64,6 +72,7 @@ class Dispatcher(object):
             address=_get_remote_address(),
             course=self.course,
             timeout=self.timeout,
+            single_thread=self.single_thread,
         )
 
         if writer is not None:
@@ -5,6 +5,15 @@ except BaseException:
 
 
 class Device(object):
+    '''モータやセンサなどのデバイスの基底クラス。
+
+    get_log()はログファイルに記録するデータを返す。get_log()はすべてのデバイスで実装する必要がある。
+    get_log()に加えてget_log_into(self, out)を実装したデバイスは、
+    LogWriterから渡されたmemoryviewのoutにデータを直接書き込むことで、データのコピーを省くことができる。
+    ただし、LogWriter.write()にデバイスのリストを渡した場合・buffer_sizeに0を指定した場合・
+    CPython以外のインタプリタの場合は、get_log_into()ではなくget_log()が使用される。
+    '''
+
     def get_log(self) -> bytes:
         raise NotImplementedError()
 
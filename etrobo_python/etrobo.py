@@ -17,6 +17,18 @@ def _pascal2snake(s: str) -> str:
         for i, (p, c) in enumerate(zip(s[:-1], s[1:])))
 
 
+# 登録できるデバイスの種類の名前（パスカルケース）とスネークケースの対応表
+_PASCAL2SNAKE = {
+    'Hub': 'hub',
+    'Motor': 'motor',
+    'ReversedMotor': 'reversed_motor',
+    'ColorSensor': 'color_sensor',
+    'TouchSensor': 'touch_sensor',
+    'SonarSensor': 'sonar_sensor',
+    'GyroSensor': 'gyro_sensor',
+}
+
+
 class ETRobo:
     '''ロボットを制御するためのオブジェクトを作成する。
     実行環境に適したバックエンドプログラムを指定すること。
@@ -121,7 +133,7 @@ class ETRobo:
         if isinstance(device_type, type):
             device_type = device_type.__name__
 
-        device_type = _pascal2snake(device_type)
+        device_type = _PASCAL2SNAKE.get(device_type) or _pascal2snake(device_type)
         device = self.backend.create_device(device_type, str(port))
         self.devices.append((name, device))
         return self
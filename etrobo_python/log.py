@@ -1,70 +1,216 @@
+import os
+import re
+import struct
+import sys
+from array import array
+
 from etrobo_python.device import (ColorSensor, Device, GyroSensor, Hub, Motor,
                                   SonarSensor, TouchSensor)
 
 try:
     from pathlib import Path
-    from typing import List, Optional, Tuple, Type, Union
+    from typing import Any, List, Optional, Tuple, Type, Union
     from types import TracebackType
 except BaseException:
     pass
 
+# ヘッダのデバイスリストのバイト数の上位ビットに記録するフラグ
+_FLAG_COMPRESSED = 0x8000
+_FLAG_COLUMNAR = 0x4000
+_FLAG_MASK = 0xc000
+
+# 圧縮モード・列指向モードで1つのブロックにまとめるレコードの数
+BLOCK_SIZE = 256
+
+# 書き込みスレッドを使用する場合に、書き込み待ちにできるデータの数
+WRITE_QUEUE_SIZE = 1024
+
+# 書き込みスレッドにflush()を指示するためのオブジェクト
+_FLUSH = object()
+
+# ヘッダのデバイスのリスト（変数名1:デバイスタイプ1,変数名2:デバイスタイプ2,...）を分割するためのパターン
+_DEVICE_HDR = re.compile(r'([^:,]+):([^,]+)')
+
+# LogReaderがログファイルから一度に読み込むレコード（全デバイス1回分のデータ）の数
+READ_BATCH = 4096
+
+# LogReader.read_all()が返すnumpyの構造化配列における、デバイスタイプごとのフィールド
+_NUMPY_FIELDS = {
+    'hub': [('time', '>u4'), ('buttons', 'u1')],
+    'motor': [('count', '>i4')],
+    'color_sensor': [('brightness', 'u1'), ('ambient', 'u1'), ('raw_color', 'u1', (3,))],
+    'touch_sensor': [('pressed', 'u1')],
+    'sonar_sensor': [('distance', '>u2')],
+    'gyro_sensor': [('angle', '>i2'), ('velocity', '>i2')],
+}
+
+
+# デバイスタイプごとの1回分のデータのバイト数
+_TYPE_LEN = {
+    'hub': 5,
+    'motor': 4,
+    'color_sensor': 5,
+    'touch_sensor': 1,
+    'sonar_sensor': 2,
+    'gyro_sensor': 4,
+}
+
+# デバイスクラスとデバイスタイプの対応
+_CLASS_TYPE = {
+    Hub: 'hub',
+    Motor: 'motor',
+    ColorSensor: 'color_sensor',
+    TouchSensor: 'touch_sensor',
+    SonarSensor: 'sonar_sensor',
+    GyroSensor: 'gyro_sensor',
+}
+
 
 def _get_type_name(device: Device) -> str:
-    if isinstance(device, Hub):
-        return 'hub'
-    elif isinstance(device, Motor):
-        return 'motor'
-    elif isinstance(device, ColorSensor):
-        return 'color_sensor'
-    elif isinstance(device, TouchSensor):
-        return 'touch_sensor'
-    elif isinstance(device, SonarSensor):
-        return 'sonar_sensor'
-    elif isinstance(device, GyroSensor):
-        return 'gyro_sensor'
-    else:
-        raise ValueError('Invalid device class: {}'.format(device.__class__.__name__))
+    device_type = _CLASS_TYPE.get(type(device))
+    if device_type is not None:
+        return device_type
+
+    # 各バックエンドのデバイスはサブクラスなので、基底クラスから探して結果を登録しておく
+    for device_class, device_type in list(_CLASS_TYPE.items()):
+        if isinstance(device, device_class):
+            _CLASS_TYPE[type(device)] = device_type
+            return device_type
+
+    raise ValueError('Invalid device class: {}'.format(device.__class__.__name__))
 
 
 def _get_binary_length(device_type: str) -> int:
-    if device_type == 'hub':
-        return 5
-    elif device_type == 'motor':
-        return 4
-    elif device_type == 'color_sensor':
-        return 5
-    elif device_type == 'touch_sensor':
-        return 1
-    elif device_type == 'sonar_sensor':
-        return 2
-    elif device_type == 'gyro_sensor':
-        return 4
-    else:
+    try:
+        return _TYPE_LEN[device_type]
+    except KeyError:
         raise ValueError('Invalid device type: {}'.format(device_type))
 
 
+def _get_offsets(lengths: List[int]) -> 'array[int]':
+    # レコード内での各デバイスのデータの開始位置（最後の要素はレコードのバイト数）
+    offsets = array('i', [0])
+    for length in lengths:
+        offsets.append(offsets[-1] + length)
+    return offsets
+
+
+def _shuffle(records: bytearray, record_size: int, count: int) -> bytearray:
+    # レコード内の同じ位置のバイトが連続するように並べ替える
+    shuffled = bytearray(len(records))
+    for k in range(record_size):
+        shuffled[k * count:(k + 1) * count] = records[k::record_size]
+    return shuffled
+
+
+def _unshuffle(shuffled: bytes, record_size: int, count: int) -> bytearray:
+    # _shuffle()で並べ替えたデータをレコードの並びに戻す
+    records = bytearray(len(shuffled))
+    for k in range(record_size):
+        records[k::record_size] = shuffled[k * count:(k + 1) * count]
+    return records
+
+
+def _to_columns(
+    records: bytearray,
+    slices: List[Tuple[int, int]],
+    record_size: int,
+    count: int,
+) -> bytearray:
+    # 同じデバイスのデータが連続するように並べ替える
+    columns = bytearray(len(records))
+    for begin, end in slices:
+        width = end - begin
+        for k in range(width):
+            columns[begin * count + k:end * count:width] = records[begin + k::record_size]
+    return columns
+
+
+def _from_columns(
+    columns: bytes,
+    slices: List[Tuple[int, int]],
+    record_size: int,
+    count: int,
+) -> bytearray:
+    # _to_columns()で並べ替えたデータをレコードの並びに戻す
+    records = bytearray(len(columns))
+    for begin, end in slices:
+        width = end - begin
+        for k in range(width):
+            records[begin + k::record_size] = columns[begin * count + k:end * count:width]
+    return records
+
+
 class LogReader(object):
     '''ログデータをファイルから読み込むためのクラス。
     LogWriterで作成されたログファイルを読み込み、デバイスごとに分割したデータを取得する。
+    デバイスごとのデータは、読み込んだデータをコピーせずに参照するmemoryviewとして取得される。
 
     ログファイルのフォーマットについては、LogWriterの説明を参照。
 
+    use_mmapをTrueにすると、ログファイルをメモリマップしてファイルから読み込まずにデータを参照する。
+    圧縮モード・列指向モードのログファイルでは、use_mmapは無視される。
+    メモリマップしたデータを参照するmemoryviewが残っている間はclose()してもメモリマップは解放されない。
+
     Args:
         path: ログファイルのパス
+        bytes_mode: Trueの場合はデバイスごとのデータをbytesとして取得する
+        use_mmap: Trueの場合はログファイルをメモリマップして読み込む
     '''
 
-    def __init__(self, path: Union[str, Path]) -> None:  # type: ignore
+    def __init__(
+        self,
+        path: Union[str, Path],  # type: ignore
+        bytes_mode: bool = False,
+        use_mmap: bool = False,
+    ) -> None:
         self.path = str(path)  # type: ignore
+        self.bytes_mode = bytes_mode
 
         self.reader = open(self.path, 'rb')
-        size = int.from_bytes(self.reader.read(2), 'big')
 
-        tokens = self.reader.read(size).decode('utf-8').split(',')
-        name_types = [token.split(':') for token in tokens]
-        self.devices = [(name, device_type) for name, device_type in name_types]
+        # ログファイルは先頭から順に読み込むので、先読みを増やすようにOSに伝える
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(self.reader.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+
+        size, = struct.unpack('>H', self.reader.read(2))
+        self.compressed = (size & _FLAG_COMPRESSED) != 0
+        self.columnar = (size & _FLAG_COLUMNAR) != 0
+        size &= ~_FLAG_MASK
+        self.data_offset = 2 + size
+
+        text = self.reader.read(size).decode('utf-8')
+        self.devices = _DEVICE_HDR.findall(text)
+
+        # findall()は一致しない部分を読み飛ばすので、ヘッダ全体が一致したことを確認する
+        if ','.join('{}:{}'.format(name, device_type) for name, device_type in self.devices) != text:
+            raise ValueError('Invalid log header: {}'.format(text))
 
         lengths = [_get_binary_length(device_type) for _, device_type in self.devices]
-        self.offsets = [sum(lengths[:i]) for i in range(len(lengths) + 1)]
+        self.offsets = _get_offsets(lengths)
+        self.slices = list(zip(self.offsets[:-1], self.offsets[1:]))
+        self.record_size = self.offsets[-1]
+
+        if self.compressed:
+            import zlib
+            self.decompress = zlib.decompress
+
+        # 複数のレコードをまとめて読み込んだデータと、次に取得するレコードの位置
+        self.chunk = b''  # type: Any
+        self.chunk_view = memoryview(self.chunk)
+        self.position = 0
+
+        # メモリマップする場合は、ファイル全体をデータとして先頭のレコードの位置から参照する
+        self.mmap = None  # type: Any
+        if use_mmap and not (self.compressed or self.columnar):
+            import mmap
+            self.mmap = mmap.mmap(self.reader.fileno(), 0, access=mmap.ACCESS_READ)
+            self.chunk = self.mmap
+            self.chunk_view = memoryview(self.mmap)
+            self.position = self.data_offset
 
     def __enter__(self) -> 'LogReader':
         return self
@@ -75,7 +221,7 @@ class LogReader(object):
         exc_value: Optional[BaseException],
         traceback: Optional[TracebackType],
     ) -> None:
-        self.reader.close()
+        self.close()
 
     def get_devices(self) -> List[Tuple[str, str]]:
         '''ログファイルに記録されているデバイスのリストを取得する。
@@ -86,35 +232,240 @@ class LogReader(object):
         '''
         return self.devices
 
-    def read(self) -> Optional[List[bytes]]:
+    def read(self) -> Optional[List[Union[bytes, memoryview]]]:
         '''ログファイルからデバイスごとに分割したデータを取得する。
 
         Returns:
             デバイスごとに分割したデータのリスト。
             デバイスのリストの順番はget_devices()で取得したものと同じ。
-            ログデータが壊れている（と思われる）場合はNoneを返す。
+            データはmemoryviewとして返す（bytes_modeがTrueの場合はbytesとして返す）。
+            ログデータが壊れている（と思われる）場合や、デバイスが記録されていない場合はNoneを返す。
         '''
-        buffer = self.reader.read(self.offsets[-1])
+        size = self.record_size
 
-        if len(buffer) < self.offsets[-1]:
+        # デバイスが記録されていないログファイルにはレコードがない
+        if size == 0:
             return None
 
-        return [buffer[b:e] for b, e in zip(self.offsets[:-1], self.offsets[1:])]
+        if self.position + size > len(self.chunk):
+            self._read_chunk()
+
+            if self.position + size > len(self.chunk):
+                return None
+
+        position = self.position
+        self.position += size
+
+        if self.bytes_mode:
+            chunk = self.chunk
+            return [chunk[position + b:position + e] for b, e in self.slices]
+
+        view = self.chunk_view
+        return [view[position + b:position + e] for b, e in self.slices]
+
+    def _read_chunk(self) -> None:
+        # メモリマップしている場合はすべてのデータを参照済み
+        if self.mmap is not None:
+            return
+
+        # 複数のレコードをまとめて読み込む
+        # 取得済みのmemoryviewが参照するデータを上書きしないように、新しいオブジェクトに読み込む
+        if self.compressed or self.columnar:
+            data = self._read_block(self.reader)
+        else:
+            data = self.reader.read(self.record_size * READ_BATCH)
+        self.chunk = self.chunk[self.position:] + data
+        self.chunk_view = memoryview(self.chunk)
+        self.position = 0
+
+    def _read_frame(self, reader: Any) -> Optional[Tuple[int, bytes]]:
+        # ブロックを1つ読み込み、(レコード数, 圧縮を展開したデータ)を返す
+        # ブロックが壊れている場合はNoneを返す
+        # ブロックのレコード数(4バイト)とデータのバイト数(4バイト)
+        header = reader.read(8)
+        if len(header) < 8:
+            return None
+
+        count, length = struct.unpack('>II', header)
+        payload = reader.read(length)
+        if len(payload) < length:
+            return None
+
+        if self.compressed:
+            try:
+                payload = self.decompress(payload)
+            except Exception:
+                return None
+        if len(payload) != self.record_size * count:
+            return None
+
+        return count, payload
+
+    def _read_block(self, reader: Any) -> Union[bytes, bytearray]:
+        # ブロックを1つ読み込み、レコードの並びに戻す
+        # ブロックが壊れている場合は空のデータを返す
+        frame = self._read_frame(reader)
+        if frame is None:
+            return b''
+
+        count, payload = frame
+        if self.columnar:
+            return _from_columns(payload, self.slices, self.record_size, count)
+        return _unshuffle(payload, self.record_size, count)
+
+    def read_all(self) -> Any:
+        '''ログファイルに記録されているすべてのデータをnumpyの構造化配列として取得する。
+        ログファイルをメモリマップした配列を返すため、データのコピーは発生しない。
+        ただし、圧縮モード・列指向モードのログファイルの場合はすべてのデータを読み込んだ配列を返す。
+        read()による読み込み位置には影響しない。このメソッドを使用するにはnumpyが必要。
+
+        配列のフィールド名はデバイスの変数名で、デバイスタイプごとに以下のフィールドを持つ。
+
+        - hub: time, buttons
+        - motor: count
+        - color_sensor: brightness, ambient, raw_color（3要素）
+        - touch_sensor: pressed
+        - sonar_sensor: distance
+        - gyro_sensor: angle, velocity
+
+        例えば、変数名がleft_motorのモーターの回転角度は ``data['left_motor']['count']`` で取得できる。
+
+        Returns:
+            記録されているレコードの数を長さとするnumpyの構造化配列。
+        '''
+        import numpy as np
+
+        dtype = np.dtype([
+            (name, _NUMPY_FIELDS[device_type]) for name, device_type in self.devices])
+
+        if dtype.itemsize == 0:
+            return np.zeros(0, dtype=dtype)
+
+        if self.columnar:
+            frames = []
+            with open(self.path, 'rb') as reader:
+                reader.seek(self.data_offset)
+                frame = self._read_frame(reader)
+                while frame is not None:
+                    frames.append(frame)
+                    frame = self._read_frame(reader)
+
+            # デバイスごとに連続したデータをそのまま配列に変換する
+            data = np.empty(sum(count for count, _ in frames), dtype=dtype)
+            position = 0
+            for count, payload in frames:
+                for (name, _), (begin, _) in zip(self.devices, self.slices):
+                    data[name][position:position + count] = np.frombuffer(
+                        payload, dtype=dtype[name], count=count, offset=begin * count)
+                position += count
+            return data
+
+        if self.compressed:
+            records = bytearray()
+            with open(self.path, 'rb') as reader:
+                reader.seek(self.data_offset)
+                while True:
+                    block = self._read_block(reader)
+                    if len(block) == 0:
+                        break
+                    records += block
+            return np.frombuffer(records, dtype=dtype)
+
+        count = (os.path.getsize(self.path) - self.data_offset) // dtype.itemsize
+
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+
+        return np.memmap(
+            self.path, dtype=dtype, mode='r', offset=self.data_offset, shape=(count,))
 
     def close(self) -> None:
         '''ログファイルを閉じる。'''
+        if self.mmap is not None:
+            self.chunk_view.release()
+            try:
+                self.mmap.close()
+            except BufferError:
+                # 取得済みのmemoryviewが残っている場合は、参照がなくなった時点で解放される
+                pass
         self.reader.close()
 
     def __iter__(self) -> 'LogReader':
         return self
 
-    def __next__(self) -> List[bytes]:
+    def __next__(self) -> List[Union[bytes, memoryview]]:
         data = self.read()
         if data is None:
             raise StopIteration()
         return data
 
 
+class _BackgroundWriter(object):
+    '''ファイルへの書き込みを別のスレッドで実行するためのクラス。
+    書き込み待ちのデータがWRITE_QUEUE_SIZE個を超えた場合は、write()は空きができるまで待つ。
+
+    Args:
+        file: 書き込み先のファイルオブジェクト
+    '''
+
+    def __init__(self, file: Any) -> None:
+        import queue
+        import threading
+
+        self.file = file
+        self.queue = queue.Queue(WRITE_QUEUE_SIZE)  # type: Any
+        self.error = None  # type: Optional[BaseException]
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self.file.closed
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def write(self, data: Union[bytes, bytearray]) -> None:
+        self._raise_error()
+        # 呼び出し元はバッファを再利用するので、コピーしてから渡す
+        self.queue.put(bytes(data))
+
+    def flush(self) -> None:
+        self._raise_error()
+        self.queue.put(_FLUSH)
+        self.queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        # 書き込みスレッドで発生した例外を呼び出し元のスレッドで送出する
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            data = self.queue.get()
+            try:
+                if data is None:
+                    return
+                elif data is _FLUSH:
+                    self.file.flush()
+                else:
+                    self.file.write(data)
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+
 class LogWriter(object):
     '''ログデータをファイルに書き込むためのクラス。
     モータやセンサから取得したデータをログファイルに書き込む。
@@ -148,29 +499,127 @@ class LogWriter(object):
         (left_motorの回転角度, right_motorの回転角度, color_sensorのbrightness, ambient, raw_color)
         ...
 
+    **圧縮モード・列指向モード**
+
+    compressまたはcolumnarをTrueにすると、BLOCK_SIZE個のレコードごとにまとめたブロックを記録する。
+    デバイスのリストのバイト数の上位2ビットには、圧縮モード(0x8000)と列指向モード(0x4000)のフラグを記録する。
+
+    .. code-block:: none
+
+        ブロックのレコード数(4バイト), ブロックのデータのバイト数(4バイト), ブロックのデータ
+
+    圧縮モードでは、ブロック内のレコードをレコード内の同じ位置のバイトが連続するように並べ替えてからzlibで圧縮する。
+    値がゆっくり変化するセンサのデータは上位バイトがほとんど変化しないため、圧縮率が高くなる。
+
+    列指向モードでは、ブロック内のレコードを同じデバイスのデータが連続するように並べ替える。
+    デバイスごとのデータをnumpyの配列などでまとめて処理しやすくなる。
+    圧縮モードと組み合わせた場合は、デバイスごとに並べ替えたデータをzlibで圧縮する。
+
+    書き込み途中のブロックはflush()またはclose()を実行した時点で書き込まれる。
+
+    **書き込みバッファ**
+
+    書き込んだデータは書き込みバッファに保存され、バッファが一杯になった時にまとめてファイルに書き込まれる。
+    バッファを大きくするとファイルへの書き込み回数（システムコールの回数）が減るが、
+    プログラムが異常終了した場合などは最大でバッファのサイズ分のデータが失われる。
+    flush()またはclose()を実行した時点でバッファの内容はすべてファイルに書き込まれる。
+
+    buffer_sizeに0を指定した場合は、os.writev()が使用できれば、
+    デバイスから取得したデータを1つにまとめずに1回のシステムコールで書き込む。
+
+    **書き込みスレッド**
+
+    threadedをTrueにすると、ファイルへの書き込みを別のスレッドで実行する。
+    SDカードへの書き込みが遅延した場合などでも、write()を呼び出す制御ループが待たされにくくなる。
+    書き込み待ちのデータがWRITE_QUEUE_SIZE個を超えた場合は、write()は空きができるまで待つ。
+    書き込みスレッドで発生した例外は、その後のwrite()・flush()・close()で送出される。
+
     Args:
         path: ログファイルのパス
         devices: ログファイルに記録するデバイスのリスト。
             デバイスは(変数名, デバイスオブジェクト)のタプルで指定する。
+        buffer_size: 書き込みバッファのサイズ（単位はバイト）。
+            -1を指定した場合はシステムの標準のサイズを使用する。
+        compress: Trueの場合はログデータを圧縮して記録する
+        columnar: Trueの場合はログデータをデバイスごとに並べ替えて記録する
+        threaded: Trueの場合はファイルへの書き込みを別のスレッドで実行する
     '''
 
     def __init__(
         self,
         path: Union[str, Path],  # type: ignore
         devices: List[Tuple[str, Device]],
+        buffer_size: int = -1,
+        compress: bool = False,
+        columnar: bool = False,
+        threaded: bool = False,
     ) -> None:
         self.path = str(path)  # type: ignore
-        self.writer = open(self.path, 'wb')
+        self.compress = compress
+        self.columnar = columnar
 
         device_types = [_get_type_name(device) for _, device in devices]
         lengths = [_get_binary_length(device_type) for device_type in device_types]
-        self.offsets = [sum(lengths[:i]) for i in range(len(lengths) + 1)]
-        self.buffer = bytearray(sum(lengths))
-
-        name_types = ['{}:{}'.format(name, _get_type_name(device)) for name, device in devices]
+        self.offsets = _get_offsets(lengths)
+        self.record_size = self.offsets[-1]
+        self.buffer = bytearray(self.record_size)
+
+        # CPythonではmemoryviewへのスライス代入の方がbytearrayへの代入より速い
+        # （PyPyなどでは逆に遅くなることがあるので、bytearrayにそのまま代入する）
+        if sys.implementation.name == 'cpython':
+            self.view = memoryview(self.buffer)  # type: Union[bytearray, memoryview]
+        else:
+            self.view = self.buffer
+
+        # デバイスごとの(書き込み開始位置, 書き込み終了位置, データを取得する関数)
+        self.sources = [
+            (self.offsets[i], self.offsets[i + 1], device.get_log)
+            for i, (_, device) in enumerate(devices)]
+
+        # get_log_into()を持つデバイスには、バッファのmemoryviewを渡してデータを直接書き込ませる
+        # (書き込み開始位置, 書き込み終了位置, データを取得する関数, 書き込み先のmemoryview)
+        self.fills = []  # type: List[Tuple[int, int, Any, Optional[memoryview]]]
+        for (begin, end, get_log), (_, device) in zip(self.sources, devices):
+            get_log_into = getattr(device, 'get_log_into', None)
+            if get_log_into is not None and isinstance(self.view, memoryview):
+                self.fills.append((begin, end, get_log_into, self.view[begin:end]))
+            else:
+                self.fills.append((begin, end, get_log, None))
+
+        name_types = [
+            '{}:{}'.format(name, device_type)
+            for (name, _), device_type in zip(devices, device_types)]
         binary = ','.join(name_types).encode('utf-8')
-        self.writer.write(int.to_bytes(len(binary), 2, 'big'))
-        self.writer.write(binary)
+        if len(binary) & _FLAG_MASK:
+            raise ValueError('Too long device list: {} bytes'.format(len(binary)))
+
+        flags = 0
+        if compress:
+            import zlib
+            self.compressor = zlib.compress
+            flags |= _FLAG_COMPRESSED
+        if columnar:
+            self.slices = list(zip(self.offsets[:-1], self.offsets[1:]))
+            flags |= _FLAG_COLUMNAR
+        if compress or columnar:
+            self.block = bytearray(self.record_size * BLOCK_SIZE)
+            self.block_count = 0
+
+        # デバイスやヘッダの確認で例外が発生した場合にファイルやスレッドが残らないように、最後に開く
+        self.writer = open(self.path, 'wb', buffering=buffer_size)  # type: Any
+        if threaded:
+            self.writer = _BackgroundWriter(self.writer)
+
+        # バッファリングしない場合は、デバイスのデータをos.writev()でまとめて書き込む
+        self.fd = None  # type: Optional[int]
+        if buffer_size == 0 and not (compress or columnar or threaded) and hasattr(os, 'writev'):
+            self.fd = self.writer.fileno()
+
+        # ヘッダは1つのバッファにまとめて1回で書き込む
+        header = bytearray(2 + len(binary))
+        struct.pack_into('>H', header, 0, len(binary) | flags)
+        header[2:] = binary
+        self.writer.write(header)
 
     def __enter__(self) -> 'LogWriter':
         return self
@@ -181,24 +630,79 @@ class LogWriter(object):
         exc_value: Optional[BaseException],
         traceback: Optional[TracebackType],
     ) -> None:
-        self.writer.close()
+        self.close()
 
-    def write(self, devices: List[Device]) -> None:
+    def write(self, devices: Optional[List[Device]] = None) -> None:
         '''デバイスから取得したデータをログファイルに書き込む。
 
         Args:
             devices: ログファイルに記録するデバイスのリスト。
+                省略した場合はLogWriterの作成時に指定したデバイスからデータを取得する。
         '''
-        for offset, device in zip(self.offsets, devices):
-            binary = device.get_log()
-            self.buffer[offset:offset + len(binary)] = binary
-
-        self.writer.write(self.buffer)
+        if self.fd is not None:
+            if devices is None:
+                self._write_vectored([get_log() for _, _, get_log in self.sources])
+            else:
+                self._write_vectored([device.get_log() for device in devices])
+            return
+
+        buffer = self.buffer
+        view = self.view
+
+        if devices is None:
+            for begin, end, get_log, out in self.fills:
+                if out is None:
+                    view[begin:end] = get_log()
+                else:
+                    get_log(out)
+        else:
+            for (begin, end, _), device in zip(self.sources, devices):
+                view[begin:end] = device.get_log()
+
+        if not (self.compress or self.columnar):
+            self.writer.write(buffer)
+            return
+
+        size = len(buffer)
+        position = self.block_count * size
+        self.block[position:position + size] = buffer
+        self.block_count += 1
+
+        if self.block_count == BLOCK_SIZE:
+            self._write_block()
+
+    def _write_vectored(self, binaries: List[bytes]) -> None:
+        size = os.writev(self.fd, binaries)  # type: ignore
+        if size < self.record_size:
+            # 一部しか書き込まれなかった場合は残りを書き込む
+            self.writer.write(b''.join(binaries)[size:])
+
+    def _write_block(self) -> None:
+        # ブロックにまとめたレコードを並べ替えて（圧縮モードの場合は圧縮して）書き込む
+        count = self.block_count
+        if count == 0:
+            return
+
+        record_size = self.record_size
+        records = self.block[:record_size * count]
+        if self.columnar:
+            payload = _to_columns(records, self.slices, record_size, count)  # type: Union[bytes, bytearray]
+        else:
+            payload = _shuffle(records, record_size, count)
+        if self.compress:
+            payload = self.compressor(payload)
+        self.writer.write(struct.pack('>II', count, len(payload)))
+        self.writer.write(payload)
+        self.block_count = 0
 
     def flush(self) -> None:
         '''ログファイルに書き込みバッファの内容を書き込む。'''
+        if self.compress or self.columnar:
+            self._write_block()
         self.writer.flush()
 
     def close(self) -> None:
         '''ログファイルを閉じる。'''
+        if (self.compress or self.columnar) and not self.writer.closed:
+            self._write_block()
         self.writer.close()
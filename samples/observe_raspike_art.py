@@ -1,9 +1,12 @@
 import argparse
+import sys
 from typing import Any
 
 from etrobo_python import (ColorSensor, ETRobo, GyroSensor, Hub, Motor,
                            SonarSensor, TouchSensor)
 
+_write = sys.stdout.write
+
 
 def print_obtained_values_in_realworld(
     hub: Hub,
@@ -16,24 +19,25 @@ def print_obtained_values_in_realworld(
 ) -> None:
     x_accel, y_accel, z_accel = hub.get_acceleration()  # type: ignore
     x_angv, y_angv, z_angv = hub.get_angular_velocity()  # type: ignore
-    lines = [
-        'Hub: time={}'.format(hub.get_time()),
-        'Hub: battery_voltage={}'.format(hub.get_battery_voltage()),
-        'Hub: battery_current={}'.format(hub.get_battery_current()),
-        'Hub: acceleration=({}, {}, {})'.format(x_accel, y_accel, z_accel),
-        'Hub: angular_velocity=({}, {}, {})'.format(x_angv, y_angv, z_angv),
-        'RightMotor: count={}'.format(right_motor.get_count()),
-        'LeftMotor: count={}'.format(left_motor.get_count()),
-        'TouchSensor: pressed={}'.format(touch_sensor.is_pressed()),
-        'ColorSensor: raw_color={}'.format(color_sensor.get_raw_color()),
-        'SonarSensor: distance={}'.format(sonar_sensor.get_distance()),
-        'GyroSensor: angular_velocity={}'.format(gyro_sensor.get_angular_velocity()),
-        'GyroSensor: angle={}'.format(gyro_sensor.get_angle())
-    ]
+    text = (
+        f'Hub: time={hub.get_time()}\n'
+        f'Hub: battery_voltage={hub.get_battery_voltage()}\n'
+        f'Hub: battery_current={hub.get_battery_current()}\n'
+        f'Hub: acceleration=({x_accel}, {y_accel}, {z_accel})\n'
+        f'Hub: angular_velocity=({x_angv}, {y_angv}, {z_angv})\n'
+        f'RightMotor: count={right_motor.get_count()}\n'
+        f'LeftMotor: count={left_motor.get_count()}\n'
+        f'TouchSensor: pressed={touch_sensor.is_pressed()}\n'
+        f'ColorSensor: raw_color={color_sensor.get_raw_color()}\n'
+        f'SonarSensor: distance={sonar_sensor.get_distance()}\n'
+        f'GyroSensor: angular_velocity={gyro_sensor.get_angular_velocity()}\n'
+        f'GyroSensor: angle={gyro_sensor.get_angle()}\n'
+    )
 
     right_motor.set_brake(True)
 
-    print('\n'.join(lines))
+    # print()を経由せずに1回で書き込む
+    _write(text)
 
 
 def run(backend: str, **kwargs: Any) -> None: